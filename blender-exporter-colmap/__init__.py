@@ -1,10 +1,18 @@
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
 from pathlib import Path
-import mathutils
-from . ext.read_write_model import write_model, Camera, Image, Point3D
+from . ext.read_write_model import write_model, Camera, ImageArrays, Points3DArrays
 from bpy.props import StringProperty, EnumProperty, BoolProperty
 import bpy
 import os
+import time
+
+try:
+    import numba
+except ImportError:
+    # Numba is optional; without it the NumPy code paths are used
+    numba = None
 
 bl_info = {
     "name": "COLMAP Exporter",
@@ -45,6 +53,21 @@ class ColmapExportSettings(bpy.types.PropertyGroup):
         default=True
     )
     
+    optimize_render_settings: BoolProperty(
+        name="Optimize Render Settings",
+        description="During export, keep render data between cameras (Persistent Data), render Cycles "
+                    "on the fastest available GPU backend and don't show renders in a window. "
+                    "Settings are restored afterwards",
+        default=True
+    )
+    
+    use_multiview_render: BoolProperty(
+        name="Multi-View Batch Render",
+        description="Render all cameras in a single Multi-View render instead of one render per camera. "
+                    "Camera names need a shared prefix (e.g. Cam.001, Cam.002)",
+        default=False
+    )
+    
     export_points: BoolProperty(
         name="Export 3D Points",
         description="Export mesh vertices as 3D points (points3D file)",
@@ -72,10 +95,237 @@ class ColmapExportSettings(bpy.types.PropertyGroup):
     )
 
 
-def extract_3d_points_from_scene(context, selected_only=False, sample_faces=False, total_samples=10000):
-    """Extract 3D points from mesh objects in the scene"""
-    points3D = {}
-    point_id = 1
+def _quantize_rgb(rgb):
+    """Convert float colors in [0, 1] to uint8, clamping out-of-range values"""
+    rgb = np.multiply(rgb, 255.0)
+    return np.clip(rgb, 0, 255, out=rgb).astype(np.uint8)
+
+
+def _reverse_base4_digits(values):
+    """Reverse the order of the 16 base-4 digits of 32-bit unsigned integers"""
+    v = values.astype(np.uint32)
+    v = (v >> np.uint32(16)) | (v << np.uint32(16))
+    v = ((v & np.uint32(0xFF00FF00)) >> np.uint32(8)) | ((v & np.uint32(0x00FF00FF)) << np.uint32(8))
+    v = ((v & np.uint32(0xF0F0F0F0)) >> np.uint32(4)) | ((v & np.uint32(0x0F0F0F0F)) << np.uint32(4))
+    v = ((v & np.uint32(0xCCCCCCCC)) >> np.uint32(2)) | ((v & np.uint32(0x33333333)) << np.uint32(2))
+    return v
+
+
+def _triangle_sample_codes(sampled_indices, num_triangles, rng):
+    """Build a scrambled 32-bit code per sample for the Basu-Owen triangle mapping
+
+    The n-th sample landing on a triangle gets n with its base-4 digits reversed, so
+    successive samples on the same triangle fall into different sub-triangles. The
+    codes are then XOR-scrambled with one random value per triangle.
+    """
+    order = np.argsort(sampled_indices, kind='stable')
+    sorted_indices = sampled_indices[order]
+    group_starts = np.searchsorted(sorted_indices, sorted_indices, side='left')
+    ranks = np.empty(len(sampled_indices), dtype=np.uint32)
+    ranks[order] = np.arange(len(sampled_indices)) - group_starts
+
+    scrambles = rng.integers(0, 2**32, size=num_triangles, dtype=np.uint32)
+    return _reverse_base4_digits(ranks) ^ scrambles[sampled_indices]
+
+
+# Corners of the four Basu-Owen sub-triangles as rows of weights over the
+# parent triangle's corners (a, b, c), indexed by base-4 digit
+_BASU_OWEN_SUBTRIANGLES = np.array([
+    [[0.0, 0.5, 0.5], [0.5, 0.0, 0.5], [0.5, 0.5, 0.0]],  # middle (bc, ac, ab)
+    [[1.0, 0.0, 0.0], [0.5, 0.5, 0.0], [0.5, 0.0, 0.5]],  # corner a (a, ab, ac)
+    [[0.5, 0.5, 0.0], [0.0, 1.0, 0.0], [0.0, 0.5, 0.5]],  # corner b (ab, b, bc)
+    [[0.5, 0.0, 0.5], [0.0, 0.5, 0.5], [0.0, 0.0, 1.0]],  # corner c (ac, bc, c)
+])
+
+
+def _basu_owen_tables():
+    """Build lookup tables for the low and high 16 bits of a code
+
+    Returns (65536, 3) centroid weights for the low half and (65536, 3, 3)
+    sub-triangle matrices for the high half.
+    """
+    byte_table = np.empty((256, 3, 3))
+    for value in range(256):
+        matrix = np.eye(3)
+        # Most significant digit is applied first
+        for shift in (6, 4, 2, 0):
+            matrix = _BASU_OWEN_SUBTRIANGLES[(value >> shift) & 3] @ matrix
+        byte_table[value] = matrix
+    # Entry (high << 8 | low) applies the low byte's digits last
+    half_table = np.einsum('lij,hjk->hlik', byte_table, byte_table).reshape(-1, 3, 3)
+    return half_table.sum(axis=1) / 3, half_table
+
+
+_BASU_OWEN_LOW_WEIGHTS, _BASU_OWEN_HIGH_MATRICES = _basu_owen_tables()
+
+
+def _basu_owen_triangle_points(codes):
+    """Map 32-bit codes to barycentric weights using the Basu-Owen construction
+
+    Each base-4 digit, most significant first, selects one of the four sub-triangles
+    of the current triangle. Returns an (N, 3) array of weights for the corners.
+    """
+    # The result is the centroid of the low 16 bits' sub-triangle, mapped into
+    # the sub-triangle picked by the high 16 bits
+    low_weights = _BASU_OWEN_LOW_WEIGHTS.take(codes & np.uint32(0xFFFF), axis=0)
+    high_matrices = _BASU_OWEN_HIGH_MATRICES.take(codes >> np.uint32(16), axis=0)
+    return np.matmul(low_weights[:, None, :], high_matrices).reshape(-1, 3)
+
+
+def _vertex_points(coords, rotation, translation, default_color, loop_verts, loop_colors,
+                   out_coords, out_rgbs):
+    """Transform mesh vertices to world space and average their loop colors
+
+    Only touches NumPy arrays, so it can run on a worker thread. Writes (N, 3)
+    positions and (N, 3) uint8 colors into the given output slices.
+    """
+    # Transform all vertices to world space in a single matmul
+    np.matmul(coords, rotation.T, out=out_coords)
+    out_coords += translation
+    
+    if loop_colors is None:
+        out_rgbs[:] = default_color
+        return
+    
+    _average_loop_colors(loop_verts, loop_colors, default_color, out_rgbs)
+
+
+def _average_loop_colors_numpy(loop_verts, loop_colors, default_color, out_rgbs):
+    """Write the mean loop color of each vertex into out_rgbs as uint8"""
+    num_verts = len(out_rgbs)
+    
+    # Average color from all loops using each vertex
+    counts = np.bincount(loop_verts, minlength=num_verts)
+    sums = np.column_stack([
+        np.bincount(loop_verts, weights=loop_colors[:, channel], minlength=num_verts)
+        for channel in range(3)
+    ])
+    out_rgbs[:] = _quantize_rgb(sums / np.maximum(counts, 1)[:, None])
+    # Loose vertices have no loops to take a color from
+    out_rgbs[counts == 0] = default_color
+
+
+def _triangle_geometry(coords, rotation, translation, tri_verts, tri_loops, loop_colors,
+                       out_coords, out_areas, out_colors):
+    """Transform mesh triangles to world space and compute their areas
+
+    Only touches NumPy arrays, so it can run on a worker thread. Writes (T, 3, 3)
+    corner positions, (T,) areas and (T, 3, 3) corner colors into the given output
+    slices. Corner colors are left untouched when the mesh has no vertex colors.
+    """
+    world_coords = coords @ rotation.T + translation
+    np.take(world_coords, tri_verts, axis=0, out=out_coords.reshape(-1, 3))
+    
+    edge1 = out_coords[:, 1] - out_coords[:, 0]
+    edge2 = out_coords[:, 2] - out_coords[:, 0]
+    out_areas[:] = 0.5 * np.linalg.norm(np.cross(edge1, edge2), axis=1)
+    
+    if loop_colors is not None:
+        out_colors[:] = loop_colors[tri_loops, :3].reshape(-1, 3, 3)
+
+
+def _sample_triangles_numpy(tri_coords, tri_colors, sampled_indices, sample_objects,
+                            object_has_colors, object_default_colors, codes):
+    """Interpolate positions and colors for the sampled triangles
+
+    Returns (N, 3) positions and (N, 3) uint8 colors. Objects without vertex colors
+    use their fallback color.
+    """
+    weights = _basu_owen_triangle_points(codes)
+    # float32 like the vertex path and the Numba kernel
+    sample_coords = np.einsum('sb,sbd->sd', weights, tri_coords[sampled_indices]).astype(np.float32)
+    
+    sample_rgbs = object_default_colors[sample_objects]
+    has_colors = object_has_colors[sample_objects]
+    if has_colors.any():
+        interpolated = np.einsum(
+            'sb,sbd->sd', weights[has_colors], tri_colors[sampled_indices[has_colors]]
+        )
+        sample_rgbs[has_colors] = _quantize_rgb(interpolated)
+    return sample_coords, sample_rgbs
+
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _sample_triangles_numba(tri_coords, tri_colors, sampled_indices, sample_objects,
+                                object_has_colors, object_default_colors, codes):
+        """Fused version of _sample_triangles_numpy, parallel over samples"""
+        num_samples = sampled_indices.shape[0]
+        sample_coords = np.empty((num_samples, 3), dtype=np.float32)
+        sample_rgbs = np.empty((num_samples, 3), dtype=np.uint8)
+        for s in numba.prange(num_samples):
+            # Basu-Owen mapping, see _basu_owen_triangle_points
+            ax, ay, bx, by, cx, cy = 1.0, 0.0, 0.0, 1.0, 0.0, 0.0
+            for i in range(16):
+                digit = (codes[s] >> (2 * (15 - i))) & 3
+                abx, aby = (ax + bx) / 2, (ay + by) / 2
+                acx, acy = (ax + cx) / 2, (ay + cy) / 2
+                bcx, bcy = (bx + cx) / 2, (by + cy) / 2
+                if digit == 0:
+                    ax, ay, bx, by, cx, cy = bcx, bcy, acx, acy, abx, aby
+                elif digit == 1:
+                    bx, by, cx, cy = abx, aby, acx, acy
+                elif digit == 2:
+                    ax, ay, cx, cy = abx, aby, bcx, bcy
+                else:
+                    ax, ay, bx, by = acx, acy, bcx, bcy
+            w0 = (ax + bx + cx) / 3
+            w1 = (ay + by + cy) / 3
+            w2 = 1.0 - w0 - w1
+            
+            t = sampled_indices[s]
+            for d in range(3):
+                sample_coords[s, d] = w0 * tri_coords[t, 0, d] + w1 * tri_coords[t, 1, d] + w2 * tri_coords[t, 2, d]
+            
+            obj = sample_objects[s]
+            for d in range(3):
+                if object_has_colors[obj]:
+                    value = (w0 * tri_colors[t, 0, d] + w1 * tri_colors[t, 1, d] + w2 * tri_colors[t, 2, d]) * 255
+                    sample_rgbs[s, d] = np.uint8(min(max(value, 0.0), 255.0))
+                else:
+                    sample_rgbs[s, d] = object_default_colors[obj, d]
+        return sample_coords, sample_rgbs
+
+    # Runs on the per-object worker threads, so it releases the GIL instead of
+    # using prange (concurrent parallel launches abort the workqueue layer)
+    @numba.njit(nogil=True, cache=True)
+    def _average_loop_colors_numba(loop_verts, loop_colors, default_color, out_rgbs):
+        """Fused version of _average_loop_colors_numpy"""
+        num_verts = out_rgbs.shape[0]
+        sums = np.zeros((num_verts, 3))
+        counts = np.zeros(num_verts, dtype=np.int64)
+        for k in range(loop_verts.shape[0]):
+            v = loop_verts[k]
+            for d in range(3):
+                sums[v, d] += loop_colors[k, d]
+            counts[v] += 1
+        for v in range(num_verts):
+            for d in range(3):
+                if counts[v] == 0:
+                    out_rgbs[v, d] = default_color[d]
+                else:
+                    value = sums[v, d] / counts[v] * 255
+                    out_rgbs[v, d] = np.uint8(min(max(value, 0.0), 255.0))
+
+    _sample_triangles = _sample_triangles_numba
+    _average_loop_colors = _average_loop_colors_numba
+else:
+    _sample_triangles = _sample_triangles_numpy
+    _average_loop_colors = _average_loop_colors_numpy
+
+
+def extract_3d_points_from_scene(context, selected_only=False, sample_faces=False, total_samples=10000, seed=None):
+    """Extract 3D points from mesh objects in the scene
+
+    Returns a Points3DArrays with positions and colors. Pass a seed to make face
+    sampling reproducible.
+    """
+    points3D = Points3DArrays(
+        ids=np.empty(0, dtype=np.int64),
+        xyz=np.empty((0, 3), dtype=np.float32),
+        rgb=np.empty((0, 3), dtype=np.uint8)
+    )
+    rng = np.random.default_rng(seed)
     
     # Get mesh objects based on selection mode
     if selected_only:
@@ -88,17 +338,40 @@ def extract_3d_points_from_scene(context, selected_only=False, sample_faces=Fals
     if not mesh_objects:
         return points3D
     
+    # Per-object inputs for the NumPy processing, and where each object's
+    # points (or triangles) start in the output buffers
+    object_inputs = []
+    object_offsets = []
+    object_has_colors = []
+    object_default_colors = []
+    num_elements = 0
+    # Fetched once, and only if some object needs evaluating
+    depsgraph = None
+    
+    # Pass 1: read the mesh data on the main thread (bpy is not thread-safe)
     for obj in mesh_objects:
-        # Get the mesh data with modifiers applied
-        depsgraph = context.evaluated_depsgraph_get()
-        obj_eval = obj.evaluated_get(depsgraph)
-        mesh = obj_eval.to_mesh()
+        # Without modifiers the original mesh can be read as is, which avoids
+        # a full copy. While the mesh is in Edit Mode (possibly through another
+        # object sharing it) obj.data is stale, and with shape keys it only
+        # holds the basis shape, so evaluate those as well.
+        needs_clear = bool(obj.modifiers) or obj.data.is_editmode or obj.data.shape_keys is not None
+        if needs_clear:
+            # Get the mesh data with modifiers applied
+            if depsgraph is None:
+                depsgraph = context.evaluated_depsgraph_get()
+            obj_eval = obj.evaluated_get(depsgraph)
+            mesh = obj_eval.to_mesh()
+        else:
+            mesh = obj.data
         
         if mesh is None:
             continue
         
-        # Get world matrix for transforming vertices
+        # Get world transform as a 3x3 rotation/scale plus translation, so vertices
+        # are transformed without a homogeneous coordinate
         world_matrix = obj.matrix_world
+        rotation = np.array(world_matrix.to_3x3(), dtype=np.float32)
+        translation = np.array(world_matrix.translation, dtype=np.float32)
         
         # Get vertex colors if available
         has_vertex_colors = len(mesh.vertex_colors) > 0
@@ -114,164 +387,208 @@ def extract_3d_points_from_scene(context, selected_only=False, sample_faces=Fals
                 for node in mat.node_tree.nodes:
                     if node.type == 'BSDF_PRINCIPLED':
                         base_color = node.inputs['Base Color'].default_value
-                        default_color = np.array([
-                            int(base_color[0] * 255),
-                            int(base_color[1] * 255),
-                            int(base_color[2] * 255)
-                        ], dtype=np.uint8)
+                        default_color = _quantize_rgb(base_color[:3])
                         break
         
+        num_verts = len(mesh.vertices)
+        coords = np.empty(num_verts * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coords)
+        coords = coords.reshape(num_verts, 3)
+        
         if sample_faces:
-            # Collect all triangles with metadata for area-weighted sampling
+            # Collect all triangles for area-weighted sampling
             mesh.calc_loop_triangles()
+            num_tris = len(mesh.loop_triangles)
+            tri_verts = np.empty(num_tris * 3, dtype=np.int32)
+            mesh.loop_triangles.foreach_get("vertices", tri_verts)
             
-            triangles_data = []
-            for tri in mesh.loop_triangles:
-                # Get triangle vertices in world space
-                v0 = world_matrix @ mesh.vertices[tri.vertices[0]].co
-                v1 = world_matrix @ mesh.vertices[tri.vertices[1]].co
-                v2 = world_matrix @ mesh.vertices[tri.vertices[2]].co
-                
-                # Calculate triangle area
-                edge1 = v1 - v0
-                edge2 = v2 - v0
-                area = 0.5 * edge1.cross(edge2).length
-                
-                # Get colors for this triangle if available
-                tri_colors = None
-                if has_vertex_colors:
-                    tri_colors = []
-                    for loop_idx in tri.loops:
-                        loop = mesh.loops[loop_idx]
-                        color = color_layer.data[loop.index].color
-                        tri_colors.append(np.array([color[0], color[1], color[2]]))
-                
-                triangles_data.append({
-                    'vertices': (v0, v1, v2),
-                    'area': area,
-                    'colors': tri_colors,
-                    'default_color': default_color
-                })
+            # Get corner loops and loop colors if available
+            tri_loops = loop_colors = None
+            if has_vertex_colors:
+                tri_loops = np.empty(num_tris * 3, dtype=np.int32)
+                mesh.loop_triangles.foreach_get("loops", tri_loops)
+                loop_colors = np.empty(len(color_layer.data) * 4, dtype=np.float32)
+                color_layer.data.foreach_get("color", loop_colors)
+                loop_colors = loop_colors.reshape(-1, 4)
             
-            # Store for later (we'll sample after collecting all meshes)
-            if not hasattr(extract_3d_points_from_scene, '_all_triangles'):
-                extract_3d_points_from_scene._all_triangles = []
-            extract_3d_points_from_scene._all_triangles.extend(triangles_data)
+            object_inputs.append((coords, rotation, translation, tri_verts, tri_loops, loop_colors))
+            num_new = num_tris
         else:
             # Extract vertices only
-            for i, vert in enumerate(mesh.vertices):
-                # Transform vertex to world space
-                world_pos = world_matrix @ vert.co
-                xyz = np.array([world_pos.x, world_pos.y, world_pos.z])
-                
-                # Get vertex color
-                if has_vertex_colors:
-                    # Average color from all loops using this vertex
-                    loop_colors = []
-                    for loop in mesh.loops:
-                        if loop.vertex_index == i:
-                            color = color_layer.data[loop.index].color
-                            loop_colors.append([
-                                int(color[0] * 255),
-                                int(color[1] * 255),
-                                int(color[2] * 255)
-                            ])
-                    if loop_colors:
-                        rgb = np.array(loop_colors[0], dtype=np.uint8)
-                    else:
-                        rgb = default_color
-                else:
-                    rgb = default_color
-                
-                # Create Point3D entry
-                points3D[point_id] = Point3D(
-                    id=point_id,
-                    xyz=xyz,
-                    rgb=rgb,
-                    error=0.0,  # No reconstruction error for ground truth
-                    image_ids=np.array([], dtype=int),  # No image correspondences
-                    point2D_idxs=np.array([], dtype=int)
-                )
-                point_id += 1
+            loop_verts = loop_colors = None
+            if has_vertex_colors:
+                loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+                mesh.loops.foreach_get("vertex_index", loop_verts)
+                loop_colors = np.empty(len(color_layer.data) * 4, dtype=np.float32)
+                color_layer.data.foreach_get("color", loop_colors)
+                loop_colors = loop_colors.reshape(-1, 4)
+            
+            object_inputs.append((coords, rotation, translation, default_color, loop_verts, loop_colors))
+            num_new = num_verts
+        
+        object_offsets.append(num_elements)
+        object_has_colors.append(has_vertex_colors)
+        object_default_colors.append(default_color)
+        num_elements += num_new
         
         # Clean up
-        obj_eval.to_mesh_clear()
+        if needs_clear:
+            obj_eval.to_mesh_clear()
+    
+    if not object_inputs:
+        return points3D
+    
+    # Pass 2: process each object on the pool, writing into its slice of the
+    # preallocated output buffers
+    object_ends = object_offsets[1:] + [num_elements]
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        if sample_faces:
+            # Corner colors stay uninitialized for objects without vertex colors;
+            # sampling never reads them
+            all_tri_coords = np.empty((num_elements, 3, 3), dtype=np.float32)
+            all_tri_colors = np.empty((num_elements, 3, 3), dtype=np.float32)
+            areas = np.empty(num_elements, dtype=np.float32)
+            jobs = [
+                pool.submit(
+                    _triangle_geometry, *inputs,
+                    all_tri_coords[start:end], areas[start:end], all_tri_colors[start:end]
+                )
+                for inputs, start, end in zip(object_inputs, object_offsets, object_ends)
+            ]
+        else:
+            xyz = np.empty((num_elements, 3), dtype=np.float32)
+            rgb = np.empty((num_elements, 3), dtype=np.uint8)
+            jobs = [
+                pool.submit(_vertex_points, *inputs, xyz[start:end], rgb[start:end])
+                for inputs, start, end in zip(object_inputs, object_offsets, object_ends)
+            ]
+        # Re-raise any error from the workers
+        for job in jobs:
+            job.result()
+    
+    if not sample_faces:
+        return Points3DArrays(ids=np.arange(1, num_elements + 1), xyz=xyz, rgb=rgb)
     
     # After processing all meshes, sample points from collected triangles
-    if sample_faces and hasattr(extract_3d_points_from_scene, '_all_triangles'):
-        all_triangles = extract_3d_points_from_scene._all_triangles
+    areas = areas.astype(np.float64)
+    total_area = areas.sum()
+    
+    if total_area > 0:
+        triangle_offsets = np.array(object_offsets)
+        object_has_colors = np.array(object_has_colors)
+        object_default_colors = np.array(object_default_colors)
         
-        if all_triangles:
-            # Calculate total area and cumulative areas for weighted sampling
-            areas = np.array([tri['area'] for tri in all_triangles])
-            total_area = areas.sum()
-            
-            if total_area > 0:
-                # Normalize areas to get probabilities
-                probabilities = areas / total_area
-                
-                # Sample triangles proportionally to their area
-                num_samples = min(total_samples, len(all_triangles) * 100)  # Cap at 100 points per triangle max
-                sampled_indices = np.random.choice(
-                    len(all_triangles),
-                    size=num_samples,
-                    p=probabilities,
-                    replace=True
-                )
-                
-                # Generate points
-                for tri_idx in sampled_indices:
-                    tri_data = all_triangles[tri_idx]
-                    v0, v1, v2 = tri_data['vertices']
-                    
-                    # Random barycentric coordinates
-                    r1 = np.random.random()
-                    r2 = np.random.random()
-                    
-                    # Ensure point is inside triangle
-                    if r1 + r2 > 1.0:
-                        r1 = 1.0 - r1
-                        r2 = 1.0 - r2
-                    
-                    r3 = 1.0 - r1 - r2
-                    
-                    # Interpolate position
-                    world_pos = r1 * v0 + r2 * v1 + r3 * v2
-                    xyz = np.array([world_pos.x, world_pos.y, world_pos.z])
-                    
-                    # Interpolate color if available
-                    if tri_data['colors']:
-                        colors = tri_data['colors']
-                        interpolated_color = r1 * colors[0] + r2 * colors[1] + r3 * colors[2]
-                        rgb = np.array([
-                            int(interpolated_color[0] * 255),
-                            int(interpolated_color[1] * 255),
-                            int(interpolated_color[2] * 255)
-                        ], dtype=np.uint8)
-                    else:
-                        rgb = tri_data['default_color']
-                    
-                    # Create Point3D entry
-                    points3D[point_id] = Point3D(
-                        id=point_id,
-                        xyz=xyz,
-                        rgb=rgb,
-                        error=0.0,
-                        image_ids=np.array([], dtype=int),
-                        point2D_idxs=np.array([], dtype=int)
-                    )
-                    point_id += 1
-        
-        # Clear the stored triangles for next run
-        extract_3d_points_from_scene._all_triangles = []
+        # Normalize areas to get probabilities
+        probabilities = areas / total_area
+        
+        # Sample triangles proportionally to their area
+        num_samples = min(total_samples, len(areas) * 100)  # Cap at 100 points per triangle max
+        sampled_indices = rng.choice(
+            len(areas),
+            size=num_samples,
+            p=probabilities,
+            replace=True
+        )
+        
+        # Codes for low-discrepancy barycentric coordinates within each sampled triangle
+        codes = _triangle_sample_codes(sampled_indices, len(areas), rng)
+        
+        # Interpolate positions and colors
+        sample_objects = np.searchsorted(triangle_offsets, sampled_indices, side='right') - 1
+        sample_coords, sample_rgbs = _sample_triangles(
+            all_tri_coords, all_tri_colors, sampled_indices, sample_objects,
+            object_has_colors, object_default_colors, codes
+        )
+        points3D = Points3DArrays(
+            ids=np.arange(1, num_samples + 1), xyz=sample_coords, rgb=sample_rgbs
+        )
     
     return points3D
 
 
+def rotation_matrices_to_quaternions(rotations):
+    """Convert (N, 3, 3) rotation matrices to (N, 4) WXYZ unit quaternions
+
+    Uses Shepperd's method: row i of K is 4 * q_i * q, and the row with the
+    largest diagonal entry is used so the division is always well conditioned.
+    """
+    m = rotations
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    K = np.stack([
+        1 + trace, m[:, 2, 1] - m[:, 1, 2], m[:, 0, 2] - m[:, 2, 0], m[:, 1, 0] - m[:, 0, 1],
+        m[:, 2, 1] - m[:, 1, 2], 1 + 2 * m[:, 0, 0] - trace, m[:, 0, 1] + m[:, 1, 0], m[:, 0, 2] + m[:, 2, 0],
+        m[:, 0, 2] - m[:, 2, 0], m[:, 0, 1] + m[:, 1, 0], 1 + 2 * m[:, 1, 1] - trace, m[:, 1, 2] + m[:, 2, 1],
+        m[:, 1, 0] - m[:, 0, 1], m[:, 0, 2] + m[:, 2, 0], m[:, 1, 2] + m[:, 2, 1], 1 + 2 * m[:, 2, 2] - trace,
+    ], axis=-1).reshape(-1, 4, 4)
+    
+    rows = np.arange(len(m))
+    best = np.argmax(np.diagonal(K, axis1=1, axis2=2), axis=1)
+    best_rows = K[rows, best]
+    return best_rows / (2 * np.sqrt(best_rows[rows, best]))[:, None]
+
+
+def quaternions_to_rotation_matrices(qvecs):
+    """Convert (N, 4) WXYZ unit quaternions to (N, 3, 3) rotation matrices"""
+    w, x, y, z = qvecs.T
+    return np.stack([
+        1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y),
+        2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x),
+        2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y),
+    ], axis=-1).reshape(-1, 3, 3)
+
+
+def camera_poses_to_colmap(locations, quaternions):
+    """Convert Blender camera transforms to COLMAP image poses
+
+    Takes (N, 3) camera locations and (N, 4) WXYZ rotations and returns (N, 4)
+    qvecs and (N, 3) tvecs as written to images.txt/bin.
+    """
+    # Reorder (w, x, y, z) -> (x, w, z, -y) to flip the camera's Y and Z axes
+    qvecs = np.column_stack([
+        quaternions[:, 1], quaternions[:, 0], quaternions[:, 3], -quaternions[:, 2]
+    ])
+    qvecs /= np.linalg.norm(qvecs, axis=1, keepdims=True)
+    
+    rotations = quaternions_to_rotation_matrices(qvecs)
+    tvecs = -np.einsum('nij,nj->ni', rotations, locations)
+    return qvecs, tvecs
+
+
+def multiview_camera_suffixes(names):
+    """Split camera names into a shared prefix and per-camera view suffixes
+
+    Multi-View finds each view's camera by replacing the active camera's suffix
+    with the view's suffix, and appends that suffix to the output file name.
+    Returns (prefix, suffixes), or None if the names can't be split that way.
+    """
+    if len(names) < 2:
+        return None
+    prefix = os.path.commonprefix(names)
+    suffixes = [name[len(prefix):] for name in names]
+    if not prefix or not all(suffixes):
+        return None
+    # Blender matches the longest view suffix against the active (first) camera
+    if any(len(suffix) > len(suffixes[0]) and names[0].endswith(suffix) for suffix in suffixes):
+        return None
+    return prefix, suffixes
+
+
 # Legacy function - not used by modal operator, kept for backwards compatibility
 # (Removed due to recurring indentation issues during edits)
 
 
+# Modal timer interval, and how long one timer tick may spend processing
+# cameras when no render is in flight (seconds)
+MODAL_TIMER_INTERVAL = 0.01
+MODAL_TIME_SLICE = 0.005
+
+# Quality of the rendered JPEG images
+JPEG_QUALITY = 95
+
+# Cycles GPU backends to try for optimized rendering, fastest first
+CYCLES_GPU_BACKENDS = ('OPTIX', 'CUDA', 'HIP', 'METAL', 'ONEAPI')
+
+
 # Global state for render callback
 _export_state = {
     'is_rendering': False,
@@ -298,29 +615,35 @@ class COLMAP_OT_export(bpy.types.Operator):
     _points_sample_faces = None
     _points_total_samples = None
     _cameras_data = {}
-    _images_data = {}
+    _cam_id_by_key = {}
+    _width = None
+    _height = None
+    _images_data = None
     _points3D_data = {}
     _original_camera = None
     _is_rendering = False
     _render_complete_handler = None
     _render_cancel_handler = None
-    _needs_save = False
-    _pending_save_path = None
+    _render_done = False
+    _original_render_output = None
+    _original_render_tuning = None
+    _multiview = None
+    _multiview_pending = False
+    _original_multiview = None
+    _multiview_view_names = []
     
     def modal(self, context, event):
         if event.type == 'TIMER':
             try:
-                # Check if we need to save a rendered image (deferred from callback)
-                if self._needs_save and self._pending_save_path:
-                    print(f"[COLMAP Export] Saving render in modal loop...")
-                    self.save_render_result(self._pending_save_path)
-                    self._needs_save = False
-                    self._pending_save_path = None
+                # The render job writes the image itself (write_still), so once
+                # it has shut down, fall through and start the next render in
+                # this same tick instead of idling for another timer interval
+                if self._render_done and not bpy.app.is_job_running('RENDER'):
+                    self._render_done = False
                     self._is_rendering = False
                     _export_state['is_rendering'] = False
                     self._current_idx += 1
                     print(f"[COLMAP Export] Render saved, moving to next camera")
-                    return {'PASS_THROUGH'}
                 
                 # If currently rendering, wait for it to complete
                 if self._is_rendering:
@@ -328,24 +651,34 @@ class COLMAP_OT_export(bpy.types.Operator):
                 
                 # Check if we're done with all cameras
                 if self._current_idx >= len(self._cameras):
+                    if self._multiview_pending:
+                        self._multiview_pending = False
+                        self.start_multiview_render(context)
+                        return {'PASS_THROUGH'}
                     print(f"[COLMAP Export] All cameras processed, finishing...")
                     return self.finish(context)
                 
-                # Process next camera
-                cam = self._cameras[self._current_idx]
-                print(f"[COLMAP Export] Processing camera {self._current_idx + 1}/{len(self._cameras)}: {cam.name}")
-                
-                self.process_camera_data(context, cam, self._current_idx)
-                
-                # Start render if enabled
-                if self._render_images:
-                    print(f"[COLMAP Export] Starting render for {cam.name}")
-                    self.start_render(context, cam)
-                else:
+                # Process next camera(s). Without rendering, keep going until the
+                # time slice is used up so the UI still gets to redraw.
+                tick_start = time.perf_counter()
+                while self._current_idx < len(self._cameras):
+                    cam = self._cameras[self._current_idx]
+                    print(f"[COLMAP Export] Processing camera {self._current_idx + 1}/{len(self._cameras)}: {cam.name}")
+                    
+                    self.process_camera_data(context, cam, self._current_idx)
+                    
+                    # Start render if enabled (Multi-View renders once at the end)
+                    if self._render_images and not self._multiview:
+                        print(f"[COLMAP Export] Starting render for {cam.name}")
+                        self.start_render(context, cam)
+                        break
+                    
                     # No rendering, move to next immediately
                     print(f"[COLMAP Export] Skipping render, moving to next camera")
                     self._current_idx += 1
                     self.update_progress(context)
+                    if time.perf_counter() - tick_start > MODAL_TIME_SLICE:
+                        break
                 
             except Exception as e:
                 print(f"[COLMAP Export] ERROR in modal: {e}")
@@ -356,59 +689,45 @@ class COLMAP_OT_export(bpy.types.Operator):
             
         return {'PASS_THROUGH'}
     
+    def compute_camera_poses(self, cameras):
+        """Compute COLMAP poses for all cameras in one batch"""
+        # Read the world transforms rather than switching rotation_mode, which
+        # would write RNA properties (and tag undo) for every camera
+        matrices = np.array([cam.matrix_world for cam in cameras], dtype=np.float64)
+        rotations = matrices[:, :3, :3]
+        # Drop any object scale, like Matrix.to_quaternion()
+        rotations = rotations / np.linalg.norm(rotations, axis=1, keepdims=True)
+        quaternions = rotation_matrices_to_quaternions(rotations)
+        return camera_poses_to_colmap(matrices[:, :3, 3], quaternions)
+    
     def process_camera_data(self, context, cam, idx):
         """Export camera data (parameters and pose)"""
         try:
-            scene = context.scene
-            camera_id = idx + 1
-            filename = f'{cam.name_full}.jpg'
-            
-            print(f"[COLMAP Export]   - Extracting camera parameters...")
-            # Get actual render dimensions (accounting for resolution scale)
-            scale = scene.render.resolution_percentage / 100.0
-            width = int(scene.render.resolution_x * scale)
-            height = int(scene.render.resolution_y * scale)
-            focal_length = cam.data.lens
-            sensor_width = cam.data.sensor_width
-            sensor_height = cam.data.sensor_height
-            fx = focal_length * width / sensor_width
-            fy = focal_length * height / sensor_height
-            
-            # Camera parameters
-            params = [fx, fy, width/2, height/2, 0, 0, 0, 0]
-            self._cameras_data[camera_id] = Camera(
-                id=camera_id,
-                model='OPENCV',
-                width=width,
-                height=height,
-                params=params
-            )
-            print(f"[COLMAP Export]   - Camera intrinsics saved")
-
-            # Camera pose
-            print(f"[COLMAP Export]   - Extracting camera pose...")
-            rotation_mode_bk = cam.rotation_mode
-            cam.rotation_mode = "QUATERNION"
-            cam_rot_orig = mathutils.Quaternion(cam.rotation_quaternion)
-            cam_rot = mathutils.Quaternion((
-                cam_rot_orig.x,
-                cam_rot_orig.w,
-                cam_rot_orig.z,
-                -cam_rot_orig.y))
-            cam.rotation_mode = rotation_mode_bk
-
-            T = mathutils.Vector(cam.location)
-            T1 = -(cam_rot.to_matrix() @ T)
-
-            self._images_data[camera_id] = Image(
-                id=camera_id,
-                qvec=np.array([cam_rot.w, cam_rot.x, cam_rot.y, cam_rot.z]),
-                tvec=np.array([T1[0], T1[1], T1[2]]),
-                camera_id=camera_id,
-                name=filename,
-                xys=[],
-                point3D_ids=[]
-            )
+            # Cameras with the same lens and sensor share one intrinsics entry
+            key = (cam.data.lens, cam.data.sensor_width, cam.data.sensor_height)
+            camera_id = self._cam_id_by_key.get(key)
+            if camera_id is None:
+                print(f"[COLMAP Export]   - Extracting camera parameters...")
+                focal_length, sensor_width, sensor_height = key
+                width, height = self._width, self._height
+                fx = focal_length * width / sensor_width
+                fy = focal_length * height / sensor_height
+                
+                # Camera parameters
+                params = [fx, fy, width/2, height/2, 0, 0, 0, 0]
+                camera_id = len(self._cam_id_by_key) + 1
+                self._cam_id_by_key[key] = camera_id
+                self._cameras_data[camera_id] = Camera(
+                    id=camera_id,
+                    model='OPENCV',
+                    width=width,
+                    height=height,
+                    params=params
+                )
+                print(f"[COLMAP Export]   - Camera intrinsics saved")
+
+            # Camera pose (precomputed for all cameras in execute)
+            self._images_data.camera_ids[idx] = camera_id
             print(f"[COLMAP Export]   - Camera pose saved")
             
         except Exception as e:
@@ -420,6 +739,8 @@ class COLMAP_OT_export(bpy.types.Operator):
     def start_render(self, context, cam):
         """Start rendering for a camera"""
         context.scene.camera = cam
+        # Blender's render job encodes and writes the JPEG on its own thread
+        context.scene.render.filepath = str(self._images_dir / self._images_data.names[self._current_idx])
         self._is_rendering = True
         _export_state['is_rendering'] = True
         _export_state['operator'] = self
@@ -427,98 +748,58 @@ class COLMAP_OT_export(bpy.types.Operator):
         self.update_progress(context)
         
         # Start render with INVOKE_DEFAULT to keep UI responsive
-        bpy.ops.render.render('INVOKE_DEFAULT', write_still=False)
+        bpy.ops.render.render('INVOKE_DEFAULT', write_still=True)
     
-    def save_render_result(self, save_path):
-        """Save the render result (called from modal loop, not callback)"""
-        temp_img = None
-        try:
-            print(f"[COLMAP Export] Saving render to: {save_path}")
-            
-            # Ensure directory exists
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Check if file exists and delete it
-            if save_path.exists():
-                print(f"[COLMAP Export] Deleting existing file...")
-                import os
-                os.remove(str(save_path))
-            
-            # Get render result
-            render_result = bpy.data.images.get('Render Result')
-            if not render_result:
-                print(f"[COLMAP Export] ERROR: No render result found!")
-                return
-            
-            # Clear any filepath from render result to avoid errors
-            render_result.filepath_raw = ""
-            
-            print(f"[COLMAP Export] Got render result, dimensions: {render_result.size[0]}x{render_result.size[1]}")
-            
-            # Use the simpler approach: save using the scene's render settings
-            print(f"[COLMAP Export] Saving using scene render settings...")
-            
-            # Temporarily set the output path
-            scene = bpy.context.scene
-            old_output = scene.render.filepath
-            old_format = scene.render.image_settings.file_format
-            
-            scene.render.filepath = str(save_path)
-            scene.render.image_settings.file_format = 'JPEG'
-            
-            print(f"[COLMAP Export] Calling save_render()...")
-            # Save directly from render result
-            render_result.save_render(filepath=str(save_path), scene=scene)
-            
-            # Restore settings
-            scene.render.filepath = old_output
-            scene.render.image_settings.file_format = old_format
-            
-            print(f"[COLMAP Export] Save completed!")
+    def start_multiview_render(self, context):
+        """Render every camera in one Multi-View render"""
+        scene = context.scene
+        render = scene.render
+        prefix, suffixes = self._multiview
+        # Views are already set up when retrying after a cancelled render
+        if self._original_multiview is None:
+            self._original_multiview = (
+                render.use_multiview, render.views_format, render.image_settings.views_format,
+                {view.name: (view.use, view.camera_suffix) for view in render.views}
+            )
             
-            # Verify
-            if save_path.exists():
-                file_size = save_path.stat().st_size
-                print(f"[COLMAP Export] File saved successfully! Size: {file_size} bytes")
-            else:
-                print(f"[COLMAP Export] WARNING: File not created!")
-                
-        except Exception as e:
-            print(f"[COLMAP Export] ERROR saving render: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
-        finally:
-            # Clean up temp image
-            if temp_img:
-                print(f"[COLMAP Export] Cleaning up temp image...")
-                try:
-                    bpy.data.images.remove(temp_img)
-                except:
-                    pass
+            # Camera lookup matches the suffixes of all views, enabled or not, so
+            # clear the existing ones (e.g. "_L"/"_R") to keep them from matching
+            for view in render.views:
+                view.use = False
+                view.camera_suffix = ""
+            self._multiview_view_names = []
+            for cam, suffix in zip(self._cameras, suffixes):
+                view = render.views.new(cam.name)
+                view.camera_suffix = suffix
+                view.use = True
+                self._multiview_view_names.append(view.name)
+            render.use_multiview = True
+            render.views_format = 'MULTIVIEW'
+            render.image_settings.views_format = 'INDIVIDUAL'
+        
+        # Each view is saved as <prefix><suffix>.jpg, i.e. <camera name>.jpg
+        scene.camera = self._cameras[0]
+        render.filepath = str(self._images_dir / f'{prefix}.jpg')
+        self._is_rendering = True
+        _export_state['is_rendering'] = True
+        _export_state['operator'] = self
+        
+        context.workspace.status_text_set(f"COLMAP Export: Rendering {len(self._cameras)} cameras (Multi-View)")
+        print(f"[COLMAP Export] Starting Multi-View render of {len(self._cameras)} cameras")
+        bpy.ops.render.render('INVOKE_DEFAULT', write_still=True)
     
     def on_render_complete(self, scene, depsgraph=None):
-        """Called when render completes - just sets flag for modal loop to handle save"""
+        """Called when render completes - just sets flag for modal loop"""
         print(f"[COLMAP Export] Render complete callback triggered")
         
         if not _export_state['is_rendering'] or _export_state['operator'] != self:
             print(f"[COLMAP Export] Ignoring render complete (not our render)")
             return
         
-        try:
-            # Don't save here - defer to modal loop to avoid threading issues
-            cam = self._cameras[self._current_idx]
-            filename = f'{cam.name_full}.jpg'
-            save_path = self._images_dir / filename
-            
-            print(f"[COLMAP Export] Setting flag to save {filename} in modal loop")
-            self._needs_save = True
-            self._pending_save_path = save_path
-            
-        except Exception as e:
-            print(f"[COLMAP Export] ERROR in render complete callback: {e}")
-            import traceback
-            traceback.print_exc()
+        # Image already written by the render job; advance in the modal loop
+        # to avoid threading issues
+        print(f"[COLMAP Export] Saved {scene.render.filepath}")
+        self._render_done = True
     
     def on_render_cancel(self, scene, depsgraph=None):
         """Called if render is cancelled"""
@@ -528,6 +809,8 @@ class COLMAP_OT_export(bpy.types.Operator):
         self._is_rendering = False
         _export_state['is_rendering'] = False
         # Don't increment, will retry or user can cancel operator
+        if self._multiview:
+            self._multiview_pending = True
     
     def update_progress(self, context):
         """Update progress display"""
@@ -539,6 +822,76 @@ class COLMAP_OT_export(bpy.types.Operator):
             status += f"Processing camera {self._current_idx + 1}/{len(self._cameras)} ({progress}%)"
         context.workspace.status_text_set(status)
     
+    def optimize_render_settings(self, context):
+        """Enable Persistent Data and pick a Cycles GPU backend for the export"""
+        scene = context.scene
+        self._original_render_tuning = {
+            'use_persistent_data': scene.render.use_persistent_data,
+            'render_display_type': context.preferences.view.render_display_type,
+        }
+        scene.render.use_persistent_data = True
+        # Don't open or redraw a render window for every camera
+        context.preferences.view.render_display_type = 'NONE'
+        
+        cycles_addon = context.preferences.addons.get('cycles')
+        if scene.render.engine != 'CYCLES' or cycles_addon is None:
+            return
+        prefs = cycles_addon.preferences
+        self._original_render_tuning.update(
+            cycles_device=scene.cycles.device,
+            compute_device_type=prefs.compute_device_type,
+            device_uses={device.id: device.use for device in prefs.devices},
+        )
+        for backend in CYCLES_GPU_BACKENDS:
+            try:
+                prefs.compute_device_type = backend
+            except TypeError:
+                # Backend not supported by this Blender build
+                continue
+            gpus = [d for d in prefs.get_devices_for_type(backend) if d.type != 'CPU']
+            if gpus:
+                for device in gpus:
+                    device.use = True
+                scene.cycles.device = 'GPU'
+                print(f"[COLMAP Export] Rendering with Cycles {backend} on {len(gpus)} device(s)")
+                return
+        prefs.compute_device_type = self._original_render_tuning['compute_device_type']
+    
+    def restore_render_settings(self, context):
+        """Restore the render settings changed for the export"""
+        render = context.scene.render
+        if self._original_render_tuning:
+            tuning = self._original_render_tuning
+            render.use_persistent_data = tuning['use_persistent_data']
+            context.preferences.view.render_display_type = tuning['render_display_type']
+            if 'cycles_device' in tuning:
+                prefs = context.preferences.addons['cycles'].preferences
+                prefs.compute_device_type = tuning['compute_device_type']
+                for device in prefs.devices:
+                    device.use = tuning['device_uses'].get(device.id, device.use)
+                context.scene.cycles.device = tuning['cycles_device']
+            self._original_render_tuning = None
+        if self._original_multiview:
+            use_multiview, views_format, image_views_format, view_states = self._original_multiview
+            for name in self._multiview_view_names:
+                render.views.remove(render.views[name])
+            for view in render.views:
+                if view.name in view_states:
+                    view.use, view.camera_suffix = view_states[view.name]
+            render.use_multiview = use_multiview
+            render.views_format = views_format
+            render.image_settings.views_format = image_views_format
+            self._original_multiview = None
+            self._multiview_view_names = []
+        if self._original_render_output:
+            image_settings = render.image_settings
+            # Format first: JPEG clamped the color mode and depth, and the old
+            # values are only valid again once the old format is back
+            (render.filepath, image_settings.file_format,
+             image_settings.color_mode, image_settings.color_depth,
+             image_settings.quality) = self._original_render_output
+            self._original_render_output = None
+    
     def cancel(self, context):
         """Cancel the export operation"""
         print(f"[COLMAP Export] Cancelling export...")
@@ -549,9 +902,10 @@ class COLMAP_OT_export(bpy.types.Operator):
         if self._render_cancel_handler in bpy.app.handlers.render_cancel:
             bpy.app.handlers.render_cancel.remove(self._render_cancel_handler)
         
-        # Restore original camera
+        # Restore original camera and render output
         if self._original_camera:
             context.scene.camera = self._original_camera
+        self.restore_render_settings(context)
         
         # Clean up
         if self._timer:
@@ -583,22 +937,23 @@ class COLMAP_OT_export(bpy.types.Operator):
                     self._points_sample_faces,
                     self._points_total_samples
                 )
-                print(f"[COLMAP Export] Extracted {len(self._points3D_data)} 3D points")
+                print(f"[COLMAP Export] Extracted {len(self._points3D_data.ids)} 3D points")
             
             # Write COLMAP model files
             print(f"[COLMAP Export] Writing COLMAP model files to {self._output_dir}...")
             write_model(
-                self._cameras_data, 
-                self._images_data, 
+                self._cameras_data,
+                self._images_data,
                 self._points3D_data, 
                 str(self._output_dir), 
                 self._format
             )
             print(f"[COLMAP Export] Model files written successfully")
             
-            # Restore original camera
+            # Restore original camera and render output
             if self._original_camera:
                 context.scene.camera = self._original_camera
+            self.restore_render_settings(context)
             
             # Clean up
             context.window_manager.event_timer_remove(self._timer)
@@ -641,7 +996,8 @@ class COLMAP_OT_export(bpy.types.Operator):
                 return {'CANCELLED'}
             
             # Setup
-            self._cameras = sorted(scene_cameras, key=lambda x: x.name_full)
+            scene_cameras.sort(key=attrgetter('name_full'))
+            self._cameras = scene_cameras
             self._current_idx = 0
             self._format = '.txt' if settings.output_format == 'TXT' else '.bin'
             self._render_images = settings.render_images
@@ -650,12 +1006,29 @@ class COLMAP_OT_export(bpy.types.Operator):
             self._points_sample_faces = settings.points_sample_faces
             self._points_total_samples = settings.points_total_samples
             self._cameras_data = {}
-            self._images_data = {}
+            self._cam_id_by_key = {}
+            # Render dimensions (accounting for resolution scale) are the same
+            # for every camera
+            render = context.scene.render
+            scale = render.resolution_percentage / 100.0
+            self._width = int(render.resolution_x * scale)
+            self._height = int(render.resolution_y * scale)
+            qvecs, tvecs = self.compute_camera_poses(self._cameras)
+            self._images_data = ImageArrays(
+                ids=np.arange(1, len(scene_cameras) + 1),
+                qvecs=qvecs,
+                tvecs=tvecs,
+                camera_ids=np.zeros(len(scene_cameras), dtype=np.int64),
+                names=[f'{cam.name_full}.jpg' for cam in scene_cameras]
+            )
             self._points3D_data = {}
             self._original_camera = context.scene.camera
             self._is_rendering = False
-            self._needs_save = False
-            self._pending_save_path = None
+            self._render_done = False
+            self._original_render_output = None
+            self._original_render_tuning = None
+            self._original_multiview = None
+            self._multiview = None
             
             print(f"[COLMAP Export] Settings: format={self._format}, render={self._render_images}, export_points={self._export_points}")
             
@@ -665,6 +1038,28 @@ class COLMAP_OT_export(bpy.types.Operator):
             if self._render_images:
                 self._images_dir.mkdir(parents=True, exist_ok=True)
                 print(f"[COLMAP Export] Created images directory")
+                render = context.scene.render
+                image_settings = render.image_settings
+                self._original_render_output = (
+                    render.filepath, image_settings.file_format,
+                    image_settings.color_mode, image_settings.color_depth,
+                    image_settings.quality
+                )
+                # Always write real JPEGs, whatever output format the scene uses
+                image_settings.file_format = 'JPEG'
+                image_settings.color_mode = 'RGB'
+                image_settings.quality = JPEG_QUALITY
+                if settings.optimize_render_settings:
+                    self.optimize_render_settings(context)
+                
+                if settings.use_multiview_render:
+                    # View lookup uses the object name, so linked cameras can't be matched
+                    names = [cam.name for cam in self._cameras]
+                    if names == [cam.name_full for cam in self._cameras]:
+                        self._multiview = multiview_camera_suffixes(names)
+                    if self._multiview is None:
+                        self.report({'WARNING'}, "Camera names have no shared prefix, rendering cameras one by one")
+            self._multiview_pending = self._multiview is not None
             
             # Register render completion handlers
             self._render_complete_handler = self.on_render_complete
@@ -675,7 +1070,7 @@ class COLMAP_OT_export(bpy.types.Operator):
             
             # Start modal operator
             wm = context.window_manager
-            self._timer = wm.event_timer_add(0.1, window=context.window)
+            self._timer = wm.event_timer_add(MODAL_TIMER_INTERVAL, window=context.window)
             wm.modal_handler_add(self)
             print(f"[COLMAP Export] Modal operator started")
             
@@ -686,7 +1081,37 @@ class COLMAP_OT_export(bpy.types.Operator):
             import traceback
             traceback.print_exc()
             self.report({'ERROR'}, f"Failed to start export: {str(e)}")
-            return {'CANCELLED'}
+            # Undo the render settings, handlers and camera changed so far
+            return self.cancel(context)
+
+
+# Camera and mesh counts shown in the panel, keyed by scene pointer. Counting
+# walks every object, so it is only redone after objects may have been added
+# or removed instead of on every redraw.
+_panel_counts = {}
+
+
+def _count_scene_objects(scene):
+    """Return (camera count, mesh count) for a scene"""
+    camera_count = mesh_count = 0
+    for obj in scene.objects:
+        if obj.type == 'CAMERA':
+            camera_count += 1
+        elif obj.type == 'MESH':
+            mesh_count += 1
+    return camera_count, mesh_count
+
+
+@bpy.app.handlers.persistent
+def _invalidate_panel_counts(scene, depsgraph):
+    # Linking or unlinking objects tags their collection (or the scene's master collection)
+    if depsgraph.id_type_updated('COLLECTION') or depsgraph.id_type_updated('SCENE'):
+        _panel_counts.pop(scene.as_pointer(), None)
+
+
+@bpy.app.handlers.persistent
+def _clear_panel_counts(*args):
+    _panel_counts.clear()
 
 
 # Panel
@@ -710,9 +1135,11 @@ class COLMAP_PT_export_panel(bpy.types.Panel):
         box = layout.box()
         col = box.column(align=True)
         
-        # Camera count
-        scene_cameras = [i for i in scene.objects if i.type == "CAMERA"]
-        camera_count = len(scene_cameras)
+        # Camera and mesh counts, cached between redraws
+        counts = _panel_counts.get(scene.as_pointer())
+        if counts is None:
+            counts = _panel_counts[scene.as_pointer()] = _count_scene_objects(scene)
+        camera_count, scene_mesh_count = counts
         
         row = col.row()
         row.alignment = 'LEFT'
@@ -731,11 +1158,9 @@ class COLMAP_PT_export_panel(bpy.types.Panel):
             row.alignment = 'LEFT'
             row.label(text=f"Selected Meshes: {mesh_count}", icon='MESH_DATA')
         else:
-            mesh_objects = [obj for obj in scene.objects if obj.type == 'MESH']
-            mesh_count = len(mesh_objects)
             row = col.row()
             row.alignment = 'LEFT'
-            row.label(text=f"Mesh Objects: {mesh_count}", icon='MESH_DATA')
+            row.label(text=f"Mesh Objects: {scene_mesh_count}", icon='MESH_DATA')
         
         layout.separator()
         
@@ -744,6 +1169,9 @@ class COLMAP_PT_export_panel(bpy.types.Panel):
         col.prop(settings, "output_path")
         col.prop(settings, "output_format")
         col.prop(settings, "render_images")
+        if settings.render_images:
+            col.prop(settings, "optimize_render_settings")
+            col.prop(settings, "use_multiview_render")
         col.prop(settings, "export_points")
         
         # Sub-options for points export
@@ -797,9 +1225,20 @@ def register():
     bpy.types.Scene.colmap_export_settings = bpy.props.PointerProperty(
         type=ColmapExportSettings
     )
+    
+    bpy.app.handlers.depsgraph_update_post.append(_invalidate_panel_counts)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.append(_clear_panel_counts)
 
 
 def unregister():
+    if _invalidate_panel_counts in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_invalidate_panel_counts)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if _clear_panel_counts in handlers:
+            handlers.remove(_clear_panel_counts)
+    _panel_counts.clear()
+    
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     
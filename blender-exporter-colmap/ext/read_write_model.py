@@ -47,6 +47,15 @@ BaseImage = collections.namedtuple(
 Point3D = collections.namedtuple(
     "Point3D", ["id", "xyz", "rgb", "error", "image_ids", "point2D_idxs"]
 )
+# Points without tracks stored as parallel arrays: (N,) ids, (N, 3) xyz and
+# (N, 3) rgb. Accepted by write_points3D_text/binary in place of a dict.
+Points3DArrays = collections.namedtuple("Points3DArrays", ["ids", "xyz", "rgb"])
+# Images without 2D points stored as parallel arrays: (N,) ids, (N, 4) qvecs,
+# (N, 3) tvecs, (N,) camera_ids and a list of N names. Accepted by
+# write_images_text/binary in place of a dict.
+ImageArrays = collections.namedtuple(
+    "ImageArrays", ["ids", "qvecs", "tvecs", "camera_ids", "names"]
+)
 
 
 class Image(BaseImage):
@@ -300,6 +309,9 @@ def write_images_text(images, path):
         void Reconstruction::ReadImagesText(const std::string& path)
         void Reconstruction::WriteImagesText(const std::string& path)
     """
+    if isinstance(images, ImageArrays):
+        write_image_arrays_text(images, path)
+        return
     if len(images) == 0:
         mean_observations = 0
     else:
@@ -340,6 +352,9 @@ def write_images_binary(images, path_to_model_file):
         void Reconstruction::ReadImagesBinary(const std::string& path)
         void Reconstruction::WriteImagesBinary(const std::string& path)
     """
+    if isinstance(images, ImageArrays):
+        write_image_arrays_binary(images, path_to_model_file)
+        return
     with open(path_to_model_file, "wb") as fid:
         write_next_bytes(fid, len(images), "Q")
         for _, img in images.items():
@@ -355,6 +370,50 @@ def write_images_binary(images, path_to_model_file):
                 write_next_bytes(fid, [*xy, p3d_id], "ddq")
 
 
+def write_image_arrays_text(images, path):
+    """Write an ImageArrays in the images.txt format (no 2D points)."""
+    HEADER = (
+        "# Image list with two lines of data per image:\n"
+        + "#   IMAGE_ID, QW, QX, QY, QZ, TX, TY, TZ, CAMERA_ID, NAME\n"
+        + "#   POINTS2D[] as (X, Y, POINT3D_ID)\n"
+        + "# Number of images: {}, mean observations per image: {}\n".format(
+            len(images.ids), 0
+        )
+    )
+
+    with open(path, "w") as fid:
+        fid.write(HEADER)
+        write = fid.write
+        for image_id, qvec, tvec, camera_id, name in zip(
+            images.ids.tolist(),
+            images.qvecs.tolist(),
+            images.tvecs.tolist(),
+            images.camera_ids.tolist(),
+            images.names,
+        ):
+            image_header = [image_id, *qvec, *tvec, camera_id, name]
+            write(" ".join(map(str, image_header)) + "\n\n")
+
+
+def write_image_arrays_binary(images, path_to_model_file):
+    """Write an ImageArrays in the images.bin format (no 2D points)."""
+    # id, qvec, tvec, camera id
+    image_struct = struct.Struct("<i4d3di")
+    # null terminator of the name, then the number of 2D points
+    name_end = b"\x00" + struct.pack("<Q", 0)
+    with open(path_to_model_file, "wb") as fid:
+        write_next_bytes(fid, len(images.ids), "Q")
+        for image_id, qvec, tvec, camera_id, name in zip(
+            images.ids.tolist(),
+            images.qvecs.tolist(),
+            images.tvecs.tolist(),
+            images.camera_ids.tolist(),
+            images.names,
+        ):
+            fid.write(image_struct.pack(image_id, *qvec, *tvec, camera_id))
+            fid.write(name.encode("utf-8") + name_end)
+
+
 def read_points3D_text(path):
     """
     see: src/colmap/scene/reconstruction.cc
@@ -431,6 +490,9 @@ def write_points3D_text(points3D, path):
         void Reconstruction::ReadPoints3DText(const std::string& path)
         void Reconstruction::WritePoints3DText(const std::string& path)
     """
+    if isinstance(points3D, Points3DArrays):
+        write_points3D_arrays_text(points3D, path)
+        return
     if len(points3D) == 0:
         mean_track_length = 0
     else:
@@ -462,6 +524,9 @@ def write_points3D_binary(points3D, path_to_model_file):
         void Reconstruction::ReadPoints3DBinary(const std::string& path)
         void Reconstruction::WritePoints3DBinary(const std::string& path)
     """
+    if isinstance(points3D, Points3DArrays):
+        write_points3D_arrays_binary(points3D, path_to_model_file)
+        return
     with open(path_to_model_file, "wb") as fid:
         write_next_bytes(fid, len(points3D), "Q")
         for _, pt in points3D.items():
@@ -475,6 +540,47 @@ def write_points3D_binary(points3D, path_to_model_file):
                 write_next_bytes(fid, [image_id, point2D_id], "ii")
 
 
+def write_points3D_arrays_text(points3D, path):
+    """Write a Points3DArrays in the points3D.txt format (empty tracks)."""
+    HEADER = (
+        "# 3D point list with one line of data per point:\n"
+        + "#   POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)\n"
+        + "# Number of points: {}, mean track length: {}\n".format(
+            len(points3D.ids), 0
+        )
+    )
+
+    with open(path, "w") as fid:
+        fid.write(HEADER)
+        # Plain Python scalars from tolist() format much faster than NumPy ones
+        write = fid.write
+        for point3D_id, (x, y, z), (r, g, b) in zip(
+            points3D.ids.tolist(), points3D.xyz.tolist(), points3D.rgb.tolist()
+        ):
+            write(f"{point3D_id} {x} {y} {z} {r} {g} {b} 0.0 \n")
+
+
+def write_points3D_arrays_binary(points3D, path_to_model_file):
+    """Write a Points3DArrays in the points3D.bin format (empty tracks)."""
+    # Packed records matching "<QdddBBBdQ": id, xyz, rgb, error, track length
+    point_dtype = np.dtype(
+        [
+            ("id", "<u8"),
+            ("xyz", "<f8", 3),
+            ("rgb", "u1", 3),
+            ("error", "<f8"),
+            ("track_length", "<u8"),
+        ]
+    )
+    table = np.zeros(len(points3D.ids), dtype=point_dtype)
+    table["id"] = points3D.ids
+    table["xyz"] = points3D.xyz
+    table["rgb"] = points3D.rgb
+    with open(path_to_model_file, "wb") as fid:
+        write_next_bytes(fid, len(points3D.ids), "Q")
+        table.tofile(fid)
+
+
 def detect_model_format(path, ext):
     if (
         os.path.isfile(os.path.join(path, "cameras" + ext))